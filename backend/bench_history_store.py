@@ -0,0 +1,109 @@
+"""
+Throughput benchmark for HistoryStore with concurrent writers.
+
+    python bench_history_store.py --writers 1 4 16 --searches 2000 --offers 20
+
+Each writer thread records searches (with normalized offers) as fast as it can.
+Reports enqueue latency seen by the request path, end-to-end committed rows/sec,
+and read latency for paginated history and cheapest-seen queries on the result.
+"""
+import os
+import time
+import random
+import argparse
+import tempfile
+import threading
+
+from history_store import HistoryStore
+
+DESTINATIONS = ["Dallas", "Paris", "Los Angeles", "San Francisco", "Miami", "Chicago", "Denver", "Seattle"]
+ORIGINS = ["New York", "Boston", "Austin", "Atlanta"]
+
+
+def synthetic_offers(rng, origin, destination, date, count):
+    return [{
+        "offer_key": f"{rng.getrandbits(48):x}",
+        "origin": origin,
+        "destination": destination,
+        "travel_date": date,
+        "price": round(rng.uniform(60, 1500), 2),
+        "currency": "USD",
+        "title": f"Airline {rng.randint(1, 30)} {rng.randint(100, 9999)}",
+        "url": None,
+        "payload": {"stops": rng.randint(0, 2), "duration": rng.randint(60, 900)},
+    } for _ in range(count)]
+
+
+def writer(store, writer_id, searches, offers_per_search, enqueue_times):
+    rng = random.Random(writer_id)
+    for i in range(searches):
+        origin, destination = rng.choice(ORIGINS), rng.choice(DESTINATIONS)
+        date = f"2025-07-{rng.randint(1, 28):02d}"
+        offers = synthetic_offers(rng, origin, destination, date, offers_per_search)
+        start = time.perf_counter()
+        store.record_search(
+            f"user{rng.randint(1, 200)}", "flight",
+            {"origin": origin, "destination": destination, "departure_date": date},
+            offers=offers, origin=origin, destination=destination, start_date=date,
+        )
+        enqueue_times.append(time.perf_counter() - start)
+
+
+def _ms(seconds):
+    return seconds * 1000
+
+
+def run(writers, searches, offers_per_search):
+    with tempfile.TemporaryDirectory() as tmp:
+        store = HistoryStore(os.path.join(tmp, "bench.db"))
+        enqueue_times = []
+        threads = [
+            threading.Thread(target=writer, args=(store, w, searches // writers, offers_per_search, enqueue_times))
+            for w in range(writers)
+        ]
+        start = time.perf_counter()
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+        store.flush()
+        elapsed = time.perf_counter() - start
+
+        total_rows = (searches // writers) * writers * (1 + offers_per_search)
+        enqueue_times.sort()
+        p99 = enqueue_times[int(len(enqueue_times) * 0.99) - 1]
+
+        start = time.perf_counter()
+        rows, cursor = store.search_history("user7", limit=20)
+        pages = 1
+        while cursor:
+            rows, cursor = store.search_history("user7", limit=20, before=cursor)
+            pages += 1
+        history_ms = _ms(time.perf_counter() - start) / pages
+
+        start = time.perf_counter()
+        for destination in DESTINATIONS:
+            store.cheapest_seen("flight", destination, origin="New York")
+            store.cheapest_seen("flight", destination, origin="New York", travel_date="2025-07-10")
+        cheapest_ms = _ms(time.perf_counter() - start) / (2 * len(DESTINATIONS))
+        store.close()
+
+    print(f"{writers:>7} {total_rows:>9} {total_rows / elapsed:>11.0f} {_ms(p99):>13.3f} "
+          f"{history_ms:>11.3f} {cheapest_ms:>12.3f}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark HistoryStore writes and queries")
+    parser.add_argument("--writers", type=int, nargs="+", default=[1, 4, 16])
+    parser.add_argument("--searches", type=int, default=2000)
+    parser.add_argument("--offers", type=int, default=20)
+    args = parser.parse_args()
+
+    print(f"{'writers':>7} {'rows':>9} {'rows/sec':>11} {'enqueue p99ms':>13} "
+          f"{'page ms':>11} {'cheapest ms':>12}")
+    for writers in args.writers:
+        run(writers, args.searches, args.offers)
+
+
+if __name__ == "__main__":
+    main()
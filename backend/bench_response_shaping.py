@@ -0,0 +1,129 @@
+"""
+Benchmark payload size and serialization time for the response shaping layer.
+
+    python bench_response_shaping.py                      # synthetic Booking.com-like response
+    python bench_response_shaping.py --recorded hotels.json  # a response saved from get_hotels()
+
+Compares the raw get_hotels() blob against the projected shape, under each
+available encoding, plus the delta payload for a repeat poll where ~5% of
+offers changed price.
+"""
+import json
+import time
+import random
+import argparse
+
+from response_shaping import (
+    DeltaTracker,
+    available_encodings,
+    build_response,
+    compress,
+    serialize,
+    shape_hotels,
+)
+
+
+def synthetic_hotel_response(num_hotels=200, seed=0):
+    """
+    Approximates the size and field mix of a list-by-map response.
+    """
+    rng = random.Random(seed)
+    hotels = []
+    for i in range(num_hotels):
+        price = round(rng.uniform(60, 600), 2)
+        hotels.append({
+            "hotel_id": 1000000 + i,
+            "hotel_name": f"Hotel {i} Downtown Suites",
+            "city": "Dallas",
+            "address": f"{rng.randint(1, 9999)} Main Street",
+            "class": rng.randint(1, 3),
+            "review_score": round(rng.uniform(5, 10), 1),
+            "review_nr": rng.randint(0, 5000),
+            "min_total_price": price,
+            "currencycode": "USD",
+            "main_photo_url": f"https://cf.bstatic.com/xdata/images/hotel/square60/{rng.randint(1, 10**9)}.jpg",
+            "latitude": rng.uniform(32.6, 33.0),
+            "longitude": rng.uniform(-97.0, -96.5),
+            "url": f"https://www.booking.com/hotel/us/hotel-{i}.html",
+            "booking_url": f"https://www.booking.com/hotel/us/hotel-{i}.html?checkin=2025-07-10&checkout=2025-07-13",
+            "price_breakdown": {
+                "gross_price": price,
+                "all_inclusive_price": price * 1.12,
+                "currency": "USD",
+                "has_tax_exceptions": 0,
+                "sum_excluded_raw": round(price * 0.12, 2),
+            },
+            "composite_price_breakdown": {
+                "items": [
+                    {"name": "VAT", "base": {"percentage": 8.25, "kind": "percentage"},
+                     "item_amount": {"value": price * 0.0825, "currency": "USD"}},
+                    {"name": "City tax", "base": {"percentage": 7, "kind": "percentage"},
+                     "item_amount": {"value": price * 0.07, "currency": "USD"}},
+                ],
+                "benefits": [],
+            },
+            "badges": [{"text": "Breakfast included", "id": "breakfast"}] * rng.randint(0, 3),
+            "unit_configuration_label": "<b>Hotel room</b>: 1 bed",
+            "distance_to_cc": str(round(rng.uniform(0.1, 20), 2)),
+            "accommodation_type_name": "Hotel",
+            "checkin": {"from": "15:00", "until": ""},
+            "checkout": {"from": "", "until": "11:00"},
+        })
+    return {"result": hotels, "count": num_hotels, "primary_count": num_hotels, "sort": []}
+
+
+def _timed(fn, repeat=20):
+    start = time.perf_counter()
+    for _ in range(repeat):
+        result = fn()
+    return result, (time.perf_counter() - start) * 1000 / repeat
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark response shaping")
+    parser.add_argument("--recorded", help="path to a JSON response saved from get_hotels()")
+    parser.add_argument("--hotels", type=int, default=200)
+    args = parser.parse_args()
+
+    if args.recorded:
+        with open(args.recorded) as f:
+            data = json.load(f)
+    else:
+        data = synthetic_hotel_response(args.hotels)
+
+    print(f"{'payload':<22} {'encoding':<9} {'bytes':>9} {'ms':>8}")
+
+    raw_body, raw_ms = _timed(lambda: json.dumps(data).encode("utf-8"))
+    print(f"{'raw get_hotels':<22} {'identity':<9} {len(raw_body):>9} {raw_ms:>8.2f}")
+
+    shaped, shape_ms = _timed(lambda: shape_hotels(data))
+    shaped_body, ser_ms = _timed(lambda: serialize(shaped))
+    print(f"{'projected':<22} {'identity':<9} {len(shaped_body):>9} {shape_ms + ser_ms:>8.2f}")
+
+    for encoding in available_encodings():
+        raw_c, raw_c_ms = _timed(lambda: compress(raw_body, encoding))
+        print(f"{'raw get_hotels':<22} {encoding:<9} {len(raw_c):>9} {raw_ms + raw_c_ms:>8.2f}")
+        shaped_c, shaped_c_ms = _timed(lambda: compress(shaped_body, encoding))
+        print(f"{'projected':<22} {encoding:<9} {len(shaped_c):>9} {shape_ms + ser_ms + shaped_c_ms:>8.2f}")
+
+    # Repeat poll: ~5% of offers changed price since the client's last ETag
+    tracker = DeltaTracker("hotel_id")
+    _, headers, _ = build_response(shaped, delta_tracker=tracker, offers_key="hotels")
+    rng = random.Random(1)
+    updated = json.loads(json.dumps(data))
+    for hotel in rng.sample(updated["result"], max(1, len(updated["result"]) // 20)):
+        hotel["min_total_price"] = round(hotel.get("min_total_price", 0) * 0.9, 2)
+    updated_shape = shape_hotels(updated)
+
+    for encoding in ["identity"] + available_encodings():
+        fresh = DeltaTracker("hotel_id")
+        build_response(shaped, delta_tracker=fresh, offers_key="hotels")
+        (_, _, body), delta_ms = _timed(lambda: build_response(
+            updated_shape, accept_encoding=encoding, if_none_match=headers["ETag"],
+            delta_tracker=fresh, offers_key="hotels", a_im="delta",
+        ), repeat=1)
+        print(f"{'delta poll':<22} {encoding:<9} {len(body):>9} {delta_ms:>8.2f}")
+
+
+if __name__ == "__main__":
+    main()
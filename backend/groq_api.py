@@ -6,6 +6,7 @@ from dotenv import load_dotenv
 
 load_dotenv()
 
+# Set to http://localhost:8001/openai/v1/chat/completions to use mock_llm_server.py
 API_URL = os.getenv("API_URL")
 API_KEY = os.getenv("GROQ_API_KEY")
 
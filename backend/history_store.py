@@ -0,0 +1,420 @@
+import os
+import json
+import time
+import uuid
+import queue
+import sqlite3
+import logging
+import threading
+
+logger = logging.getLogger("history_store")
+
+HISTORY_DB_PATH = os.getenv("VOY_HISTORY_DB", os.path.join(os.path.expanduser("~"), ".voyagent", "history.db"))
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS searches (
+    id TEXT PRIMARY KEY,
+    user_id TEXT NOT NULL,
+    kind TEXT NOT NULL,
+    origin TEXT,
+    destination TEXT,
+    start_date TEXT,
+    end_date TEXT,
+    params TEXT,
+    created_at REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_searches_user_recent ON searches (user_id, created_at DESC, id DESC);
+
+CREATE TABLE IF NOT EXISTS offers (
+    id INTEGER PRIMARY KEY,
+    search_id TEXT NOT NULL,
+    kind TEXT NOT NULL,
+    offer_key TEXT,
+    origin TEXT,
+    destination TEXT,
+    travel_date TEXT,
+    price REAL,
+    currency TEXT,
+    title TEXT,
+    url TEXT,
+    payload TEXT,
+    created_at REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_offers_search ON offers (search_id);
+CREATE INDEX IF NOT EXISTS idx_offers_route_price ON offers (kind, destination, origin, price);
+CREATE INDEX IF NOT EXISTS idx_offers_route_date ON offers (kind, destination, origin, travel_date, price);
+
+CREATE TABLE IF NOT EXISTS trips (
+    id TEXT PRIMARY KEY,
+    user_id TEXT NOT NULL,
+    name TEXT,
+    destination TEXT,
+    start_date TEXT,
+    end_date TEXT,
+    offers TEXT,
+    created_at REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_trips_user_recent ON trips (user_id, created_at DESC, id DESC);
+"""
+
+INSERT_SEARCH = """
+INSERT OR REPLACE INTO searches (id, user_id, kind, origin, destination, start_date, end_date, params, created_at)
+VALUES (:id, :user_id, :kind, :origin, :destination, :start_date, :end_date, :params, :created_at)
+"""
+
+INSERT_OFFER = """
+INSERT INTO offers (search_id, kind, offer_key, origin, destination, travel_date, price, currency, title, url, payload, created_at)
+VALUES (:search_id, :kind, :offer_key, :origin, :destination, :travel_date, :price, :currency, :title, :url, :payload, :created_at)
+"""
+
+INSERT_TRIP = """
+INSERT OR REPLACE INTO trips (id, user_id, name, destination, start_date, end_date, offers, created_at)
+VALUES (:id, :user_id, :name, :destination, :start_date, :end_date, :offers, :created_at)
+"""
+
+# Optional offer columns, so callers can pass partial offer dicts
+OFFER_DEFAULTS = {
+    "offer_key": None,
+    "origin": None,
+    "destination": None,
+    "travel_date": None,
+    "price": None,
+    "currency": None,
+    "title": None,
+    "url": None,
+}
+
+
+def _to_price(value):
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return None
+
+
+def normalize_hotel_offers(hotel_data: dict, params: dict) -> list:
+    """
+    Flatten a get_hotels() response into offer rows.
+    """
+    hotels = hotel_data.get("result") or hotel_data.get("results") or []
+    offers = []
+    for hotel in hotels:
+        offers.append({
+            "offer_key": str(hotel.get("hotel_id", "")),
+            "origin": None,
+            "destination": params.get("location"),
+            "travel_date": params.get("arrival_date"),
+            "price": _to_price(hotel.get("min_total_price")),
+            "currency": hotel.get("currencycode") or "USD",
+            "title": hotel.get("hotel_name"),
+            "url": hotel.get("booking_url"),
+            "payload": hotel,
+        })
+    return offers
+
+
+def normalize_flight_offers(flights: list, origin: str, destination: str, departure_date: str) -> list:
+    """
+    Flatten processed flights (FlightAgent._process_flight_results "data") into offer rows.
+    """
+    offers = []
+    for flight in flights:
+        offers.append({
+            "offer_key": flight.get("itineraryId"),
+            "origin": origin,
+            "destination": destination,
+            "travel_date": departure_date,
+            "price": _to_price(flight.get("price")),
+            "currency": "USD",
+            "title": f"{flight.get('airline', '')} {flight.get('flightNumber', '')}".strip(),
+            "url": None,
+            "payload": flight,
+        })
+    return offers
+
+
+def _unit_rows(unit):
+    return sum(len(rows) for _, rows in unit)
+
+
+class HistoryStore:
+    """
+    SQLite (WAL mode) store for searches, offers and saved trips.
+
+    Writes are queued and committed in batches by a single background writer
+    thread, so callers on the request path never wait on disk; the writer also
+    opens the database and creates the schema. Each queued unit (a search with
+    its offers, or a trip) is committed atomically. Reads use one connection per
+    calling thread and run concurrently with the writer.
+    """
+    def __init__(self, path=HISTORY_DB_PATH, batch_size=500, flush_interval=0.05, max_queue=0):
+        self.path = path
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self._queue = queue.Queue(maxsize=max_queue)
+        self._local = threading.local()
+        self._closed = False
+        self._ready = threading.Event()
+        self._init_error = None
+
+        self._writer = threading.Thread(target=self._run_writer, name="history-writer", daemon=True)
+        self._writer.start()
+
+    def _connect(self):
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        conn = sqlite3.connect(self.path, timeout=30)
+        conn.row_factory = sqlite3.Row
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        return conn
+
+    def _reader(self):
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            # The writer creates the schema; reads only make sense after that
+            self._ready.wait()
+            if self._init_error is not None:
+                raise RuntimeError(f"History store unavailable: {self._init_error}")
+            conn = self._local.conn = self._connect()
+        return conn
+
+    # Writes
+
+    def _enqueue(self, unit):
+        """
+        Queue a unit of work: a list of (statement, rows) committed together.
+        """
+        if self._closed:
+            raise RuntimeError("HistoryStore is closed")
+        try:
+            self._queue.put_nowait(unit)
+        except queue.Full:
+            logger.warning("History write queue full, dropping %d row(s)", _unit_rows(unit))
+
+    def record_search(self, user_id, kind, params, offers=(), origin=None, destination=None,
+                      start_date=None, end_date=None):
+        """
+        Queue a search and its normalized offers. Returns the new search id immediately.
+        """
+        search_id = uuid.uuid4().hex
+        created_at = time.time()
+        unit = [(INSERT_SEARCH, [{
+            "id": search_id,
+            "user_id": user_id,
+            "kind": kind,
+            "origin": origin,
+            "destination": destination,
+            "start_date": start_date,
+            "end_date": end_date,
+            "params": json.dumps(params, default=str),
+            "created_at": created_at,
+        }])]
+        if offers:
+            unit.append((INSERT_OFFER, [{
+                **OFFER_DEFAULTS,
+                **offer,
+                "search_id": search_id,
+                "kind": kind,
+                "payload": json.dumps(offer.get("payload"), default=str),
+                "created_at": created_at,
+            } for offer in offers]))
+        self._enqueue(unit)
+        return search_id
+
+    def save_trip(self, user_id, name, destination=None, start_date=None, end_date=None, offers=()):
+        """
+        Queue a chosen trip (the offers the user picked). Returns the trip id.
+        """
+        trip_id = uuid.uuid4().hex
+        self._enqueue([(INSERT_TRIP, [{
+            "id": trip_id,
+            "user_id": user_id,
+            "name": name,
+            "destination": destination,
+            "start_date": start_date,
+            "end_date": end_date,
+            "offers": json.dumps(list(offers), default=str),
+            "created_at": time.time(),
+        }])])
+        return trip_id
+
+    def _open_writer(self):
+        try:
+            conn = self._connect()
+            conn.executescript(SCHEMA)
+            conn.commit()
+            return conn
+        except (sqlite3.Error, OSError) as e:
+            logger.error(f"Could not open history store at {self.path}: {e}")
+            self._init_error = e
+            return None
+        finally:
+            self._ready.set()
+
+    def _write_units(self, conn, units):
+        """
+        Commit units in one transaction; if that fails, retry them one by one
+        so a single bad unit doesn't take the rest of the batch with it.
+        """
+        def write(unit):
+            for statement, rows in unit:
+                conn.executemany(statement, rows)
+
+        try:
+            with conn:
+                for unit in units:
+                    write(unit)
+            return
+        except sqlite3.Error as e:
+            if len(units) == 1:
+                logger.error(f"History write failed, dropping {_unit_rows(units[0])} row(s): {e}")
+                return
+            logger.warning(f"History batch write failed ({len(units)} units), retrying individually: {e}")
+
+        for unit in units:
+            try:
+                with conn:
+                    write(unit)
+            except sqlite3.Error as e:
+                logger.error(f"History write failed, dropping {_unit_rows(unit)} row(s): {e}")
+
+    def _run_writer(self):
+        conn = self._open_writer()
+        stopping = False
+        while not stopping:
+            first = self._queue.get()
+            batch = [first]
+            rows = _unit_rows(first) if isinstance(first, list) else self.batch_size
+            deadline = time.monotonic() + self.flush_interval
+            # Gather more work until the batch is full, the interval elapses or a sentinel arrives
+            while rows < self.batch_size:
+                timeout = deadline - time.monotonic()
+                if timeout <= 0:
+                    break
+                try:
+                    item = self._queue.get(timeout=timeout)
+                except queue.Empty:
+                    break
+                batch.append(item)
+                if not isinstance(item, list):
+                    break
+                rows += _unit_rows(item)
+
+            units = [item for item in batch if isinstance(item, list)]
+            stopping = any(item is None for item in batch)
+            try:
+                if units and conn is not None:
+                    self._write_units(conn, units)
+            finally:
+                for item in batch:
+                    if isinstance(item, threading.Event):
+                        item.set()
+        if conn is not None:
+            conn.close()
+
+    def flush(self, timeout=None):
+        """
+        Block until everything queued before this call has been committed.
+        Returns False if timeout elapses first; raises if the writer isn't running.
+        """
+        if self._closed:
+            raise RuntimeError("HistoryStore is closed")
+        if not self._writer.is_alive():
+            raise RuntimeError("History writer thread has stopped")
+        done = threading.Event()
+        self._queue.put(done)
+        deadline = None if timeout is None else time.monotonic() + timeout
+        # Wait in slices so a writer that dies meanwhile can't leave us blocked forever
+        while not done.wait(0.1 if deadline is None else max(0, min(0.1, deadline - time.monotonic()))):
+            if not self._writer.is_alive():
+                raise RuntimeError("History writer thread has stopped")
+            if deadline is not None and time.monotonic() >= deadline:
+                return False
+        return True
+
+    def close(self):
+        if self._closed:
+            return
+        self._closed = True
+        self._queue.put(None)
+        self._writer.join()
+        conn = getattr(self._local, "conn", None)
+        if conn is not None:
+            conn.close()
+            self._local.conn = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    # Reads
+
+    def search_history(self, user_id, limit=20, before=None, kind=None):
+        """
+        Most recent searches first. Pass the returned next cursor as `before`
+        to get the following page. Returns (rows, next_cursor_or_None).
+        """
+        sql = "SELECT * FROM searches WHERE user_id = ?"
+        args = [user_id]
+        if kind:
+            sql += " AND kind = ?"
+            args.append(kind)
+        if before:
+            sql += " AND (created_at, id) < (?, ?)"
+            args.extend(before)
+        sql += " ORDER BY created_at DESC, id DESC LIMIT ?"
+        args.append(limit)
+
+        rows = [dict(row) for row in self._reader().execute(sql, args)]
+        for row in rows:
+            row["params"] = json.loads(row["params"]) if row["params"] else {}
+        next_cursor = (rows[-1]["created_at"], rows[-1]["id"]) if len(rows) == limit else None
+        return rows, next_cursor
+
+    def offers_for_search(self, search_id):
+        rows = self._reader().execute(
+            "SELECT * FROM offers WHERE search_id = ? ORDER BY price IS NULL, price", (search_id,)
+        )
+        return [self._offer_row(row) for row in rows]
+
+    def cheapest_seen(self, kind, destination, origin=None, travel_date=None, limit=1):
+        """
+        Cheapest offers ever recorded for a route (hotels: origin None), optionally
+        on one travel date. Served straight from the route indexes.
+        """
+        sql = "SELECT * FROM offers WHERE kind = ? AND destination = ? AND origin IS ? AND price IS NOT NULL"
+        args = [kind, destination, origin]
+        if travel_date:
+            sql += " AND travel_date = ?"
+            args.append(travel_date)
+        sql += " ORDER BY price LIMIT ?"
+        args.append(limit)
+        return [self._offer_row(row) for row in self._reader().execute(sql, args)]
+
+    def list_trips(self, user_id, limit=20, before=None):
+        """
+        Saved trips, newest first, with the same cursor scheme as search_history.
+        """
+        sql = "SELECT * FROM trips WHERE user_id = ?"
+        args = [user_id]
+        if before:
+            sql += " AND (created_at, id) < (?, ?)"
+            args.extend(before)
+        sql += " ORDER BY created_at DESC, id DESC LIMIT ?"
+        args.append(limit)
+
+        rows = [dict(row) for row in self._reader().execute(sql, args)]
+        for row in rows:
+            row["offers"] = json.loads(row["offers"]) if row["offers"] else []
+        next_cursor = (rows[-1]["created_at"], rows[-1]["id"]) if len(rows) == limit else None
+        return rows, next_cursor
+
+    @staticmethod
+    def _offer_row(row):
+        offer = dict(row)
+        offer["payload"] = json.loads(offer["payload"]) if offer["payload"] else None
+        return offer
@@ -0,0 +1,155 @@
+"""
+Concurrent session load test for the Groq call paths against mock_llm_server.
+
+Each simulated session runs two LLM round trips (extraction, then a summary):
+
+    --target hotel   groq_api, as backend/main.py does (API_URL)
+    --target flight  the top-level main.FlightAgent extract_with_groq and
+                     format_response_with_groq through the Groq SDK (GROQ_BASE_URL)
+
+By default an in-process mock server is started and the client is pointed at it:
+
+    python load_test.py --sessions 1000 --ttft-ms 200 --tokens-per-sec 80
+    python load_test.py --target flight --sessions 1000
+
+Pass --api-url (the full .../chat/completions URL) to hit an already running server instead.
+
+The hotel path (requests) never retries, so the flight target also disables the
+Groq SDK's automatic 429/5xx retries by default; pass --max-retries to measure them.
+"""
+import os
+import sys
+import time
+import importlib.util
+import argparse
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from mock_llm_server import MockConfig, create_server
+
+COMPLETIONS_PATH = "/openai/v1/chat/completions"
+FLIGHT_MAIN_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), os.pardir, "main.py")
+
+
+def _percentile(sorted_values, pct):
+    if not sorted_values:
+        return 0.0
+    index = min(len(sorted_values) - 1, int(round(pct / 100.0 * (len(sorted_values) - 1))))
+    return sorted_values[index]
+
+
+def run_hotel_session(groq_api, session_id):
+    """
+    Returns (latency_seconds, error_or_None) for one extraction + summary round trip.
+    """
+    start = time.perf_counter()
+    try:
+        params = groq_api.extract_parameters_from_user_input(
+            f"Session {session_id}: hotel in Texas from 08/01/2026 to 08/04/2026 for 2 adults"
+        )
+        groq_api.groq_ai_call(f"Summarize hotels in {params.get('location')} for the traveler.")
+        return time.perf_counter() - start, None
+    except Exception as e:
+        return time.perf_counter() - start, type(e).__name__
+
+
+def run_flight_session(agent, session_id):
+    """
+    Same as run_hotel_session for FlightAgent. Both methods swallow errors and
+    return a fallback, so those fallbacks are counted as failures here.
+    """
+    start = time.perf_counter()
+    query = f"Session {session_id}: flights from New York to Dallas on July 10th for 2 people"
+    extracted = agent.extract_with_groq(query)
+    if not extracted:
+        return time.perf_counter() - start, "ExtractionFailed"
+    reply = agent.format_response_with_groq(query, {"data": [], "extracted": extracted})
+    if reply == "Sorry, I couldn't generate a helpful summary.":
+        return time.perf_counter() - start, "FormattingFailed"
+    return time.perf_counter() - start, None
+
+
+def load_flight_agent(max_retries=0):
+    """
+    Import the top-level main.py under another name (backend/main.py shadows it).
+    GROQ_BASE_URL is read at import time, so call this after setting it.
+    """
+    os.environ.setdefault("GROQ_API_KEY", "mock-key")
+    spec = importlib.util.spec_from_file_location("flight_main", FLIGHT_MAIN_PATH)
+    module = importlib.util.module_from_spec(spec)
+    sys.modules["flight_main"] = module
+    spec.loader.exec_module(module)
+    agent = module.FlightAgent()
+    agent.groq = agent.groq.with_options(max_retries=max_retries)
+    return agent
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Load test the Groq call path against the mock server")
+    parser.add_argument("--target", choices=["hotel", "flight"], default="hotel")
+    parser.add_argument("--sessions", type=int, default=1000)
+    parser.add_argument("--api-url", default=None, help="use a running server instead of an in-process one")
+    parser.add_argument("--ttft-ms", type=float, default=150.0)
+    parser.add_argument("--tokens-per-sec", type=float, default=100.0)
+    parser.add_argument("--error-rate", type=float, default=0.0, help="fraction answered with 500")
+    parser.add_argument("--rate-limit-rate", type=float, default=0.0, help="fraction answered with 429")
+    parser.add_argument("--max-retries", type=int, default=0, help="Groq SDK retries for --target flight")
+    parser.add_argument("--max-concurrency", type=int, default=0)
+    args = parser.parse_args()
+
+    server = None
+    if args.api_url:
+        os.environ["API_URL"] = args.api_url
+    else:
+        config = MockConfig(
+            ttft_ms=args.ttft_ms,
+            tokens_per_sec=args.tokens_per_sec,
+            error_rate=args.error_rate,
+            rate_limit_rate=args.rate_limit_rate,
+            max_concurrency=args.max_concurrency,
+            seed=0,
+        )
+        server = create_server("127.0.0.1", 0, config)
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        os.environ["API_URL"] = f"http://127.0.0.1:{server.server_port}{COMPLETIONS_PATH}"
+
+    if args.target == "flight":
+        if os.environ["API_URL"].endswith(COMPLETIONS_PATH):
+            os.environ["GROQ_BASE_URL"] = os.environ["API_URL"][:-len(COMPLETIONS_PATH)]
+        else:
+            os.environ["GROQ_BASE_URL"] = os.environ["API_URL"]
+        agent = load_flight_agent(args.max_retries)
+        session = lambda i: run_flight_session(agent, i)
+    else:
+        # groq_api reads API_URL at import time, so import only after it is set
+        import groq_api
+        session = lambda i: run_hotel_session(groq_api, i)
+
+    retries = args.max_retries if args.target == "flight" else 0
+    print(f"Running {args.sessions} concurrent {args.target} sessions against {os.environ['API_URL']} "
+          f"(client retries: {retries})")
+    wall_start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=args.sessions) as pool:
+        results = list(pool.map(session, range(args.sessions)))
+    wall = time.perf_counter() - wall_start
+
+    if server:
+        server.shutdown()
+        server.server_close()
+
+    latencies = sorted(latency for latency, error in results if error is None)
+    errors = {}
+    for _, error in results:
+        if error:
+            errors[error] = errors.get(error, 0) + 1
+
+    print(f"Completed: {len(latencies)}/{args.sessions} in {wall:.2f}s "
+          f"({args.sessions / wall:.1f} sessions/s)")
+    print(f"Latency p50={_percentile(latencies, 50):.3f}s "
+          f"p95={_percentile(latencies, 95):.3f}s p99={_percentile(latencies, 99):.3f}s")
+    if errors:
+        print(f"Errors: {errors}")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,8 +1,10 @@
 from groq_api import extract_parameters_from_user_input, summarize_hotels
 from booking_api import get_hotels
 from utils import ensure_dates_not_past, extract_parameters
+from history_store import HistoryStore, normalize_hotel_offers
+import os
 import json
-def main():
+def search_hotels(history):
     user_input = input("✈️ Tell me about your dream trip: ")
 
     try:
@@ -24,6 +26,20 @@ def main():
     # Extract hotel list from common keys
     hotels_list = hotel_data.get('result', [])
 
+    # Only queues the write; the store's background thread does the disk work
+    try:
+        history.record_search(
+            os.getenv("VOY_USER_ID", "local"),
+            "hotel",
+            params,
+            offers=normalize_hotel_offers(hotel_data, params),
+            destination=params.get("location"),
+            start_date=params.get("arrival_date"),
+            end_date=params.get("departure_date"),
+        )
+    except Exception as e:
+        print(f"Error saving search history: {e}")
+
     if hotels_list:
         print("Example hotel data (first hotel):")
         print(json.dumps(hotels_list[0], indent=2))
@@ -44,5 +60,14 @@ def main():
     print("\n📋 Summary of your hotel options:\n")
     print(summary)
 
+def main():
+    # Opening the store doesn't touch disk; its writer thread creates the database
+    history = HistoryStore()
+    try:
+        search_hotels(history)
+    finally:
+        # Runs after all output is shown; waits for queued history writes to commit
+        history.close()
+
 if __name__ == "__main__":
     main()
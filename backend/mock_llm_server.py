@@ -0,0 +1,308 @@
+"""
+Groq/OpenAI-compatible mock chat completion server for local load testing.
+
+Serves POST .../chat/completions with deterministic, schema-valid answers so the
+Groq-dependent code can be exercised without network access or quota:
+
+    python mock_llm_server.py --port 8001 --ttft-ms 200 --tokens-per-sec 80
+
+Then point the clients at it:
+
+    API_URL=http://localhost:8001/openai/v1/chat/completions   (backend/groq_api.py)
+    GROQ_BASE_URL=http://localhost:8001                         (main.py FlightAgent)
+
+Every option can also be set through the matching MOCK_LLM_* environment variable.
+"""
+import os
+import json
+import time
+import random
+import hashlib
+import logging
+import argparse
+import threading
+from datetime import date, timedelta
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger("mock_llm_server")
+
+CITIES = ["New York", "Dallas", "Paris", "Los Angeles", "San Francisco", "San Jose", "Chicago", "Miami"]
+STATES = ["California", "Texas", "Florida", "New York", "Colorado", "Washington", "Nevada", "Hawaii"]
+TRAVEL_PURPOSES = ["leisure", "business"]
+
+SUMMARY_TEMPLATE = (
+    "Great news! I found a few options for you. The top result is a {stops} flight "
+    "priced at ${price} that departs in the morning and arrives the same day. "
+    "It balances price and travel time well, so it is my recommendation. "
+    "Let me know if you would like me to look at other dates or airlines."
+)
+
+
+class MockConfig:
+    def __init__(self, ttft_ms=150.0, tokens_per_sec=100.0, error_rate=0.0,
+                 rate_limit_rate=0.0, max_concurrency=0, seed=None):
+        self.ttft_ms = ttft_ms
+        self.tokens_per_sec = tokens_per_sec
+        self.error_rate = error_rate
+        self.rate_limit_rate = rate_limit_rate
+        self.max_concurrency = max_concurrency
+        self.rng = random.Random(seed)
+        self.rng_lock = threading.Lock()
+        self.slots = threading.BoundedSemaphore(max_concurrency) if max_concurrency > 0 else None
+
+    @classmethod
+    def from_env(cls):
+        seed = os.getenv("MOCK_LLM_SEED")
+        return cls(
+            ttft_ms=float(os.getenv("MOCK_LLM_TTFT_MS", "150")),
+            tokens_per_sec=float(os.getenv("MOCK_LLM_TOKENS_PER_SEC", "100")),
+            error_rate=float(os.getenv("MOCK_LLM_ERROR_RATE", "0")),
+            rate_limit_rate=float(os.getenv("MOCK_LLM_RATE_LIMIT_RATE", "0")),
+            max_concurrency=int(os.getenv("MOCK_LLM_MAX_CONCURRENCY", "0")),
+            seed=int(seed) if seed else None,
+        )
+
+    def roll(self):
+        with self.rng_lock:
+            return self.rng.random()
+
+
+def _prompt_seed(prompt: str) -> random.Random:
+    """
+    Seed a generator from the prompt so identical prompts get identical answers.
+    """
+    digest = hashlib.sha256(prompt.encode("utf-8")).digest()
+    return random.Random(int.from_bytes(digest[:8], "big"))
+
+
+def _future_dates(rng: random.Random, nights_max=7):
+    start = date.today() + timedelta(days=rng.randint(7, 90))
+    end = start + timedelta(days=rng.randint(1, nights_max))
+    return start.isoformat(), end.isoformat()
+
+
+def build_completion_text(prompt: str) -> str:
+    """
+    Pick a deterministic answer matching the schema the prompt asks for.
+    """
+    rng = _prompt_seed(prompt)
+
+    # FlightAgent.extract_with_groq
+    if '"originCity"' in prompt:
+        origin, destination = rng.sample(CITIES, 2)
+        departure, return_date = _future_dates(rng)
+        return json.dumps({
+            "originCity": origin,
+            "destinationCity": destination,
+            "departureDate": departure,
+            "returnDate": return_date,
+            "passengers": rng.randint(1, 4),
+        })
+
+    # groq_api.extract_parameters_from_user_input
+    if "travel_purpose" in prompt:
+        arrival, departure = _future_dates(rng)
+        children_qty = rng.randint(0, 2)
+        return json.dumps({
+            "location": rng.choice(STATES),
+            "arrival_date": arrival,
+            "departure_date": departure,
+            "guest_qty": rng.randint(1, 4),
+            "children_qty": children_qty,
+            "children_age": [rng.randint(1, 16) for _ in range(children_qty)],
+            "travel_purpose": rng.choice(TRAVEL_PURPOSES),
+        })
+
+    # FlightAgent.format_response_with_groq and anything else
+    return SUMMARY_TEMPLATE.format(
+        stops=rng.choice(["nonstop", "one-stop"]),
+        price=rng.randint(89, 899),
+    )
+
+
+def _tokenize(text: str):
+    """
+    Split into whitespace-preserving chunks, roughly one per word.
+    """
+    tokens = []
+    current = ""
+    for ch in text:
+        current += ch
+        if ch == " ":
+            tokens.append(current)
+            current = ""
+    if current:
+        tokens.append(current)
+    return tokens
+
+
+class MockLLMHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    config = MockConfig()
+
+    def log_message(self, format, *args):
+        logger.debug("%s - %s", self.address_string(), format % args)
+
+    def _send_json(self, status, body):
+        payload = json.dumps(body).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(payload)))
+        self.end_headers()
+        self.wfile.write(payload)
+
+    def _send_error(self, status, message, error_type):
+        self._send_json(status, {"error": {"message": message, "type": error_type}})
+
+    def do_GET(self):
+        if self.path.rstrip("/").endswith("/health"):
+            self._send_json(200, {"status": "ok"})
+        else:
+            self._send_error(404, f"Unknown path {self.path}", "invalid_request_error")
+
+    def do_POST(self):
+        length = int(self.headers.get("Content-Length", 0))
+        raw = self.rfile.read(length) if length else b""
+
+        if not self.path.rstrip("/").endswith("/chat/completions"):
+            self._send_error(404, f"Unknown path {self.path}", "invalid_request_error")
+            return
+
+        try:
+            body = json.loads(raw or b"{}")
+            messages = body["messages"]
+        except (ValueError, KeyError):
+            self._send_error(400, "Request body must be JSON with 'messages'", "invalid_request_error")
+            return
+
+        config = self.config
+        if config.slots is not None and not config.slots.acquire(blocking=False):
+            self._send_error(429, "Mock concurrency limit reached", "rate_limit_exceeded")
+            return
+
+        try:
+            if config.rate_limit_rate and config.roll() < config.rate_limit_rate:
+                self._send_error(429, "Injected rate limit", "rate_limit_exceeded")
+                return
+            if config.error_rate and config.roll() < config.error_rate:
+                self._send_error(500, "Injected server error", "internal_server_error")
+                return
+
+            prompt = "\n".join(str(m.get("content", "")) for m in messages)
+            text = build_completion_text(prompt)
+            model = body.get("model", "mock-llm")
+
+            if body.get("stream"):
+                self._stream_completion(model, prompt, text)
+            else:
+                self._full_completion(model, prompt, text)
+        finally:
+            if config.slots is not None:
+                config.slots.release()
+
+    def _token_delay(self):
+        tps = self.config.tokens_per_sec
+        return 1.0 / tps if tps > 0 else 0.0
+
+    def _full_completion(self, model, prompt, text):
+        tokens = _tokenize(text)
+        time.sleep(self.config.ttft_ms / 1000.0 + len(tokens) * self._token_delay())
+        self._send_json(200, {
+            "id": f"chatcmpl-mock-{hashlib.md5(prompt.encode('utf-8')).hexdigest()[:12]}",
+            "object": "chat.completion",
+            "created": int(time.time()),
+            "model": model,
+            "choices": [{
+                "index": 0,
+                "message": {"role": "assistant", "content": text},
+                "finish_reason": "stop",
+            }],
+            "usage": {
+                "prompt_tokens": len(_tokenize(prompt)),
+                "completion_tokens": len(tokens),
+                "total_tokens": len(_tokenize(prompt)) + len(tokens),
+            },
+        })
+
+    def _stream_completion(self, model, prompt, text):
+        completion_id = f"chatcmpl-mock-{hashlib.md5(prompt.encode('utf-8')).hexdigest()[:12]}"
+        created = int(time.time())
+
+        self.send_response(200)
+        self.send_header("Content-Type", "text/event-stream")
+        self.send_header("Cache-Control", "no-cache")
+        self.send_header("Connection", "close")
+        self.end_headers()
+        self.close_connection = True
+
+        def chunk(delta, finish_reason=None):
+            event = {
+                "id": completion_id,
+                "object": "chat.completion.chunk",
+                "created": created,
+                "model": model,
+                "choices": [{"index": 0, "delta": delta, "finish_reason": finish_reason}],
+            }
+            self.wfile.write(f"data: {json.dumps(event)}\n\n".encode("utf-8"))
+            self.wfile.flush()
+
+        time.sleep(self.config.ttft_ms / 1000.0)
+        chunk({"role": "assistant", "content": ""})
+        delay = self._token_delay()
+        for token in _tokenize(text):
+            chunk({"content": token})
+            if delay:
+                time.sleep(delay)
+        chunk({}, finish_reason="stop")
+        self.wfile.write(b"data: [DONE]\n\n")
+        self.wfile.flush()
+
+
+class MockLLMServer(ThreadingHTTPServer):
+    daemon_threads = True
+    # Large backlog so 1000+ simultaneous sessions are not refused by the kernel
+    request_queue_size = 2048
+
+
+def create_server(host="127.0.0.1", port=8001, config=None):
+    """
+    Build a server bound to (host, port); use port 0 to pick a free port.
+    """
+    handler = type("ConfiguredMockLLMHandler", (MockLLMHandler,), {"config": config or MockConfig.from_env()})
+    return MockLLMServer((host, port), handler)
+
+
+def main():
+    defaults = MockConfig.from_env()
+    parser = argparse.ArgumentParser(description="Groq/OpenAI-compatible mock completion server")
+    parser.add_argument("--host", default=os.getenv("MOCK_LLM_HOST", "127.0.0.1"))
+    parser.add_argument("--port", type=int, default=int(os.getenv("MOCK_LLM_PORT", "8001")))
+    parser.add_argument("--ttft-ms", type=float, default=defaults.ttft_ms, help="time to first token")
+    parser.add_argument("--tokens-per-sec", type=float, default=defaults.tokens_per_sec, help="0 disables pacing")
+    parser.add_argument("--error-rate", type=float, default=defaults.error_rate, help="fraction answered with 500")
+    parser.add_argument("--rate-limit-rate", type=float, default=defaults.rate_limit_rate, help="fraction answered with 429")
+    parser.add_argument("--max-concurrency", type=int, default=defaults.max_concurrency, help="0 means unlimited")
+    parser.add_argument("--seed", type=int, default=os.getenv("MOCK_LLM_SEED"), help="seed for error injection")
+    args = parser.parse_args()
+
+    config = MockConfig(
+        ttft_ms=args.ttft_ms,
+        tokens_per_sec=args.tokens_per_sec,
+        error_rate=args.error_rate,
+        rate_limit_rate=args.rate_limit_rate,
+        max_concurrency=args.max_concurrency,
+        seed=args.seed,
+    )
+    server = create_server(args.host, args.port, config)
+    logger.info(f"Mock LLM server listening on http://{args.host}:{server.server_port}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,333 @@
+import gzip
+import json
+import hashlib
+import logging
+import threading
+from collections import OrderedDict
+
+logger = logging.getLogger("response_shaping")
+
+# Optional codecs; gzip is always available
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+# Offer ids; always kept in projections so deltas can identify offers
+HOTEL_ID_FIELD = "hotel_id"
+FLIGHT_ID_FIELD = "itineraryId"
+
+# Fields the mobile client needs for list views when it doesn't ask for specific ones
+HOTEL_DEFAULT_FIELDS = [
+    "hotel_id",
+    "hotel_name",
+    "city",
+    "address",
+    "class",
+    "review_score",
+    "min_total_price",
+    "currencycode",
+    "main_photo_url",
+    "latitude",
+    "longitude",
+    "booking_url",
+]
+
+FLIGHT_DEFAULT_FIELDS = [
+    "itineraryId",
+    "airline",
+    "flightNumber",
+    "price",
+    "departureTime",
+    "arrivalTime",
+    "stops",
+    "duration",
+]
+
+# Minimum body size worth compressing; smaller payloads go out as identity
+MIN_COMPRESS_BYTES = 512
+
+# Instance manipulation a client names in A-IM (RFC 3229) to opt in to deltas
+DELTA_IM = "delta"
+
+
+def parse_fields(fields_param):
+    """
+    Parse a sparse fieldset query value like "hotel_name,booking_url,price.amount"
+    into a list of dotted paths. Returns None for an empty value (no projection).
+    """
+    if not fields_param:
+        return None
+    if isinstance(fields_param, (list, tuple)):
+        return [f.strip() for f in fields_param if f and f.strip()]
+    return [f.strip() for f in fields_param.split(",") if f.strip()]
+
+
+def _build_tree(fields):
+    tree = {}
+    for path in fields:
+        node = tree
+        for part in path.split("."):
+            node = node.setdefault(part, {})
+    return tree
+
+
+def _apply_tree(value, tree):
+    if not tree:
+        return value
+    if isinstance(value, list):
+        return [_apply_tree(item, tree) for item in value]
+    if not isinstance(value, dict):
+        return value
+    return {key: _apply_tree(value[key], subtree) for key, subtree in tree.items() if key in value}
+
+
+def project(value, fields):
+    """
+    Keep only the given dotted paths. Lists are projected element-wise, so
+    project(hotels, ["hotel_name", "price.amount"]) works on a list of hotels.
+    """
+    if not fields:
+        return value
+    return _apply_tree(value, _build_tree(fields))
+
+
+def _with_id(fields, id_field, defaults):
+    fields = parse_fields(fields) or defaults
+    return fields if id_field in fields else [id_field] + fields
+
+
+def shape_hotels(hotel_data: dict, fields=None, limit=None) -> dict:
+    """
+    Turn the raw get_hotels() response into the compact shape sent to the app.
+    """
+    hotels = hotel_data.get("result") or hotel_data.get("results") or []
+    if limit:
+        hotels = hotels[:limit]
+    return {
+        "hotels": project(hotels, _with_id(fields, HOTEL_ID_FIELD, HOTEL_DEFAULT_FIELDS)),
+        "count": len(hotels),
+    }
+
+
+def shape_flight_recommendations(result: dict, fields=None, include_raw=False) -> dict:
+    """
+    Compact a get_flight_recommendations() result from either agent. The raw
+    api_response is only kept when include_raw is set.
+
+    Flights are taken from the result's own "data" list (flight_agent/flight_agent.py)
+    or an already processed api_response["data"] list. The top-level main.py
+    returns the raw FlyScraper body; normalize its itineraries first (e.g. with
+    flight_agent/flight_results.process_itineraries) and pass them as result["data"].
+    """
+    shaped = {key: value for key, value in result.items() if key != "api_response"}
+    api_response = result.get("api_response")
+
+    flights = result.get("data")
+    if flights is None and isinstance(api_response, dict):
+        flights = api_response.get("data")
+        if isinstance(flights, dict):
+            logger.warning("api_response holds raw itineraries; normalize them into result['data'] first")
+    if isinstance(flights, list):
+        shaped["data"] = project(flights, _with_id(fields, FLIGHT_ID_FIELD, FLIGHT_DEFAULT_FIELDS))
+
+    if include_raw and api_response is not None:
+        shaped["api_response"] = api_response
+    return shaped
+
+
+def serialize(value) -> bytes:
+    """
+    Compact, key-sorted JSON so equal payloads always produce equal bytes/ETags.
+    """
+    return json.dumps(value, separators=(",", ":"), sort_keys=True, ensure_ascii=False).encode("utf-8")
+
+
+def compute_etag(body: bytes) -> str:
+    """
+    Weak ETag over the full JSON: the identity, compressed and delta bodies are
+    different bytes for the same offers, so they only share a weak validator.
+    """
+    return 'W/"' + hashlib.blake2b(body, digest_size=12).hexdigest() + '"'
+
+
+def _opaque_tag(tag: str) -> str:
+    # If-None-Match uses weak comparison, so W/"x" and "x" name the same state
+    tag = tag.strip()
+    return tag[2:] if tag.startswith("W/") else tag
+
+
+def available_encodings():
+    encodings = ["gzip"]
+    if brotli is not None:
+        encodings.insert(0, "br")
+    if zstandard is not None:
+        encodings.insert(0, "zstd")
+    return encodings
+
+
+def negotiate_encoding(accept_encoding) -> str:
+    """
+    Pick the best supported encoding from an Accept-Encoding header, honouring
+    q-values. Ties are broken by server preference (zstd, br, gzip).
+    """
+    if not accept_encoding:
+        return "identity"
+
+    offered = {}
+    for item in accept_encoding.split(","):
+        parts = item.strip().split(";")
+        name = parts[0].strip().lower()
+        if not name:
+            continue
+        q = 1.0
+        for param in parts[1:]:
+            key, _, val = param.strip().partition("=")
+            if key == "q":
+                try:
+                    q = float(val)
+                except ValueError:
+                    q = 0.0
+        offered[name] = q
+
+    best, best_q = "identity", 0.0
+    for encoding in available_encodings():
+        q = offered.get(encoding, offered.get("*", 0.0))
+        if q > best_q:
+            best, best_q = encoding, q
+    return best
+
+
+def compress(body: bytes, encoding: str) -> bytes:
+    if encoding == "gzip":
+        return gzip.compress(body, compresslevel=6)
+    if encoding == "br":
+        return brotli.compress(body, quality=5)
+    if encoding == "zstd":
+        return zstandard.ZstdCompressor(level=3).compress(body)
+    return body
+
+
+def _offer_hash(offer) -> str:
+    return hashlib.blake2b(serialize(offer), digest_size=8).hexdigest()
+
+
+class DeltaTracker:
+    """
+    Remembers recent offer snapshots by ETag so repeat polls can be answered
+    with only the offers that changed since the client's last response.
+
+    Only per-offer hashes are stored, and at most max_snapshots are kept (LRU).
+    A client whose base ETag has been evicted simply gets a full response.
+    Every delta carries the full ordered id list, so a ranking change with no
+    offer changes still lets the client rebuild the list the new ETag names.
+    Safe to share between the threads of a threaded server.
+    """
+    def __init__(self, id_field, max_snapshots=1024):
+        self.id_field = id_field
+        self.max_snapshots = max_snapshots
+        self._snapshots = OrderedDict()
+        self._lock = threading.Lock()
+
+    def can_track(self, offers):
+        """
+        Deltas need a unique id on every offer; otherwise fall back to full responses.
+        """
+        ids = [offer.get(self.id_field) for offer in offers]
+        return None not in ids and len(set(map(str, ids))) == len(ids)
+
+    def remember(self, etag, offers):
+        hashes = {str(offer.get(self.id_field)): _offer_hash(offer) for offer in offers}
+        with self._lock:
+            self._snapshots[etag] = hashes
+            self._snapshots.move_to_end(etag)
+            while len(self._snapshots) > self.max_snapshots:
+                self._snapshots.popitem(last=False)
+
+    def diff(self, base_etag, offers):
+        """
+        Returns {"base": etag, "upserted": [...], "removed": [ids], "order": [ids]}
+        or None when the base snapshot is unknown.
+        """
+        with self._lock:
+            base = self._snapshots.get(base_etag)
+            if base is None:
+                return None
+            self._snapshots.move_to_end(base_etag)
+
+        upserted = []
+        order = []
+        for offer in offers:
+            offer_id = str(offer.get(self.id_field))
+            order.append(offer_id)
+            if base.get(offer_id) != _offer_hash(offer):
+                upserted.append(offer)
+        seen = set(order)
+        removed = [offer_id for offer_id in base if offer_id not in seen]
+        return {"base": base_etag, "upserted": upserted, "removed": removed, "order": order}
+
+
+def _wants_delta(a_im):
+    return any(item.split(";")[0].strip().lower() == DELTA_IM for item in (a_im or "").split(","))
+
+
+def build_response(payload: dict, accept_encoding=None, if_none_match=None,
+                   delta_tracker=None, offers_key=None, a_im=None):
+    """
+    Serialize and encode a shaped payload for the client.
+
+    If the client's If-None-Match matches the current (weak) ETag, returns a 304.
+
+    Deltas are opt-in: only when a delta_tracker is given, the client sends
+    "A-IM: delta" (pass the header, or "delta" for an equivalent query parameter,
+    as a_im) and its If-None-Match names an earlier snapshot is payload[offers_key]
+    replaced by a delta ({"delta": {...}}) against it. That reply is a 226 IM Used
+    with Cache-Control: no-store, so caches never store it as the full resource.
+    Offers must all carry a unique id_field for deltas; otherwise the full
+    payload is sent.
+
+    Returns (status, headers, body_bytes).
+    """
+    full_body = serialize(payload)
+    etag = compute_etag(full_body)
+
+    client_tags = [_opaque_tag(tag) for tag in if_none_match.split(",")] if if_none_match else []
+    if _opaque_tag(etag) in client_tags:
+        return 304, {"ETag": etag}, b""
+
+    status = 200
+    body = full_body
+    headers = {"ETag": etag, "Content-Type": "application/json; charset=utf-8", "Vary": "Accept-Encoding"}
+
+    if delta_tracker is not None and offers_key:
+        headers["Vary"] = "Accept-Encoding, A-IM"
+        offers = payload.get(offers_key) or []
+        if not delta_tracker.can_track(offers):
+            logger.warning(f"Offers lack a unique '{delta_tracker.id_field}', sending full response")
+            delta = None
+        else:
+            wants_delta = _wants_delta(a_im) and client_tags
+            delta = delta_tracker.diff(client_tags[0], offers) if wants_delta else None
+            delta_tracker.remember(_opaque_tag(etag), offers)
+        if delta is not None:
+            delta["base"] = "W/" + delta["base"]
+            delta_payload = {key: value for key, value in payload.items() if key != offers_key}
+            delta_payload["delta"] = delta
+            body = serialize(delta_payload)
+            status = 226
+            headers["IM"] = DELTA_IM
+            headers["Cache-Control"] = "no-store"
+            headers["Vary"] = "Accept-Encoding, A-IM, If-None-Match"
+            headers["X-Delta-Base"] = delta["base"]
+
+    encoding = negotiate_encoding(accept_encoding) if len(body) >= MIN_COMPRESS_BYTES else "identity"
+    if encoding != "identity":
+        body = compress(body, encoding)
+        headers["Content-Encoding"] = encoding
+    headers["Content-Length"] = str(len(body))
+    return status, headers, body
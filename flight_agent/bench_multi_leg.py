@@ -0,0 +1,79 @@
+"""
+Benchmark combine_itineraries on synthetic per-leg candidate sets.
+
+    python bench_multi_leg.py
+
+Checks the k-best DP against brute force on small inputs, then times it for
+2-8 legs with a few hundred candidates per leg.
+"""
+import time
+import random
+import itertools
+from datetime import datetime, timedelta
+
+from multi_leg_planner import combine_itineraries
+
+
+def synthetic_leg_candidates(num_legs, per_leg, seed=0, days_between_legs=3):
+    rng = random.Random(seed)
+    start = datetime(2025, 7, 10)
+    legs = []
+    for leg in range(num_legs):
+        day = start + timedelta(days=leg * days_between_legs)
+        flights = []
+        for i in range(per_leg):
+            # Spread departures over a +/-1 day window so some combinations are infeasible
+            departure = day + timedelta(minutes=rng.randint(-1440, 2880))
+            duration = rng.randint(60, 900)
+            flights.append({
+                "airline": f"Airline {rng.randint(1, 20)}",
+                "flightNumber": str(rng.randint(100, 9999)),
+                "price": round(rng.uniform(60, 1500), 2),
+                "departureTime": departure.isoformat(),
+                "arrivalTime": (departure + timedelta(minutes=duration)).isoformat(),
+                "stops": rng.randint(0, 2),
+                "duration": duration,
+                "itineraryId": f"leg{leg}-{i}",
+            })
+        legs.append(flights)
+    return legs
+
+
+def brute_force(leg_candidates, k, duration_weight, min_connection_minutes):
+    connection = timedelta(minutes=min_connection_minutes)
+    results = []
+    for combo in itertools.product(*leg_candidates):
+        feasible = all(
+            datetime.fromisoformat(a["arrivalTime"]) + connection <= datetime.fromisoformat(b["departureTime"])
+            for a, b in zip(combo, combo[1:])
+        )
+        if feasible:
+            results.append(sum(f["price"] + duration_weight * f["duration"] for f in combo))
+    return [round(c, 2) for c in sorted(results)[:k]]
+
+
+def check_correctness():
+    for seed in range(20):
+        legs = synthetic_leg_candidates(num_legs=4, per_leg=7, seed=seed, days_between_legs=1)
+        expected = brute_force(legs, 5, 0.5, 60)
+        actual = [i["total_cost"] for i in combine_itineraries(legs, k=5)]
+        assert actual == expected, f"seed {seed}: {actual} != {expected}"
+    print("Correctness: k-best DP matches brute force on 20 random 4-leg instances")
+
+
+def main():
+    check_correctness()
+    print(f"{'legs':>5} {'per leg':>8} {'k':>4} {'time (ms)':>10} {'best cost':>10}")
+    for num_legs in (2, 3, 5, 8):
+        for per_leg in (100, 500):
+            for k in (5, 20):
+                legs = synthetic_leg_candidates(num_legs, per_leg, seed=num_legs)
+                start = time.perf_counter()
+                itineraries = combine_itineraries(legs, k=k)
+                elapsed = (time.perf_counter() - start) * 1000
+                best = itineraries[0]["total_cost"] if itineraries else None
+                print(f"{num_legs:>5} {per_leg:>8} {k:>4} {elapsed:>10.1f} {best!s:>10}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,91 @@
+"""
+Benchmark the worker pool stages on large synthetic FlyScraper responses.
+
+    python bench_worker_pool.py --pages 64 --itineraries 500
+
+Times decode + normalize + rank with 1, 2, 4 ... up to os.cpu_count() worker
+processes and reports the speedup over inline execution.
+"""
+import os
+import json
+import time
+import random
+import argparse
+from datetime import datetime, timedelta
+
+from worker_pool import WorkerPool, decode_and_rank_pages
+
+
+def synthetic_page(num_itineraries, seed):
+    """
+    A FlyScraper /flight/search body with the nesting _process_flight_results reads
+    plus the bulk (segments, agents) real responses carry.
+    """
+    rng = random.Random(seed)
+    start = datetime(2025, 7, 10, 6)
+    itineraries = []
+    for i in range(num_itineraries):
+        departure = start + timedelta(minutes=rng.randint(0, 1080))
+        duration = rng.randint(60, 900)
+        itineraries.append({
+            "id": f"{seed}-{i}",
+            "pricing": {"pricingOptions": [
+                {"price": {"amount": round(rng.uniform(60, 1500), 2)},
+                 "agentIds": [f"agent{rng.randint(1, 50)}" for _ in range(3)]}
+                for _ in range(3)
+            ]},
+            "legs": [{
+                "id": f"leg-{seed}-{i}",
+                "departure": {"time": departure.isoformat()},
+                "arrival": {"time": (departure + timedelta(minutes=duration)).isoformat()},
+                "durationInMinutes": duration,
+                "stopCount": rng.randint(0, 2),
+                "carriers": {"marketing": [{"name": f"Airline {rng.randint(1, 30)}",
+                                            "flightNumber": str(rng.randint(100, 9999))}]},
+                "segments": [{
+                    "origin": {"displayCode": "JFK", "name": "New York John F. Kennedy"},
+                    "destination": {"displayCode": "DFW", "name": "Dallas Fort Worth International"},
+                    "departure": departure.isoformat(),
+                    "durationInMinutes": duration // 2,
+                    "flightNumber": str(rng.randint(100, 9999)),
+                } for _ in range(2)],
+            }],
+        })
+    return json.dumps({"data": {"context": {"status": "complete"}, "itineraries": itineraries}})
+
+
+def run_once(raw_pages, pool):
+    start = time.perf_counter()
+    ranked = decode_and_rank_pages(raw_pages, pool)
+    return time.perf_counter() - start, len(ranked), ranked[0]["itineraryId"]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the flight worker pool")
+    parser.add_argument("--pages", type=int, default=64)
+    parser.add_argument("--itineraries", type=int, default=500)
+    parser.add_argument("--mode", default="process", choices=["process", "thread"])
+    args = parser.parse_args()
+
+    raw_pages = [synthetic_page(args.itineraries, seed) for seed in range(args.pages)]
+    total_mb = sum(len(page) for page in raw_pages) / 1024 / 1024
+    print(f"{args.pages} pages x {args.itineraries} itineraries ({total_mb:.1f} MB), {os.cpu_count()} CPUs")
+
+    with WorkerPool(mode="inline") as pool:
+        baseline, count, best = run_once(raw_pages, pool)
+    print(f"{'workers':>8} {'seconds':>9} {'speedup':>8}")
+    print(f"{'inline':>8} {baseline:>9.3f} {1.0:>8.2f}")
+
+    workers = 1
+    while workers <= (os.cpu_count() or 1):
+        # Thresholds of 0 force pooled execution; a single worker still runs inline
+        with WorkerPool(mode=args.mode, max_workers=workers, inline_items=0, inline_bytes=0) as pool:
+            pool.map(len, ["warm"] * workers)  # start workers outside the timed region
+            elapsed, pooled_count, pooled_best = run_once(raw_pages, pool)
+        assert (pooled_count, pooled_best) == (count, best), "pooled result differs from inline"
+        print(f"{workers:>8} {elapsed:>9.3f} {baseline / elapsed:>8.2f}")
+        workers *= 2
+
+
+if __name__ == "__main__":
+    main()
@@ -5,6 +5,9 @@ from dotenv import load_dotenv
 from datetime import datetime
 import logging
 
+from flight_results import process_itineraries
+from worker_pool import WorkerPool, process_and_rank_itineraries, process_itineraries_pooled
+
 # Configure logging
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
 logger = logging.getLogger('flight_agent')
@@ -14,8 +17,13 @@ load_dotenv()
 RAPIDAPI_KEY = os.getenv("RAPIDAPI_KEY")
 
 class FlightAgent:
-    def __init__(self):
+    def __init__(self, pool=None, rank=False):
         self.api_key = RAPIDAPI_KEY
+        # Optional worker_pool.WorkerPool to run normalization on; it never changes the results
+        self.pool = pool
+        # Re-rank all itineraries by worker_pool.score_flight before keeping the top 10,
+        # instead of keeping FlyScraper's own first 10 (sort: best)
+        self.rank = rank
         if not self.api_key:
             logger.warning("RAPIDAPI_KEY is not set. API calls will fail.")
         
@@ -167,47 +175,14 @@ class FlightAgent:
             if not itineraries:
                 return {"data": [], "count": 0, "message": "No flights found"}
             
-            processed_flights = []
-            
             # Extract relevant flight information
-            for itinerary in itineraries[:10]:  # Limit to top 10 flights
-                legs = itinerary.get("legs", [])
-                if not legs:
-                    continue
-                
-                # Get first leg details
-                leg = legs[0]
-                
-                # Extract price
-                price_info = itinerary.get("pricing", {}).get("pricingOptions", [{}])[0]
-                price = price_info.get("price", {}).get("amount", "N/A")
-                
-                # Extract airline info
-                carriers = leg.get("carriers", {})
-                marketing = carriers.get("marketing", [{}])[0]
-                airline_name = marketing.get("name", "Unknown Airline")
-                flight_number = marketing.get("flightNumber", "")
-                
-                # Extract times
-                departure_time = leg.get("departure", {}).get("time", "")
-                arrival_time = leg.get("arrival", {}).get("time", "")
-                
-                # Extract stops
-                stop_count = leg.get("stopCount", 0)
-                duration = leg.get("durationInMinutes", 0)
-                
-                processed_flight = {
-                    "airline": airline_name,
-                    "flightNumber": flight_number,
-                    "price": price,
-                    "departureTime": departure_time,
-                    "arrivalTime": arrival_time,
-                    "stops": stop_count,
-                    "duration": duration,
-                    "itineraryId": itinerary.get("id", "")
-                }
-                
-                processed_flights.append(processed_flight)
+            if self.rank:
+                pool = self.pool or WorkerPool(mode="inline")
+                processed_flights = process_and_rank_itineraries(itineraries, pool)[:10]
+            elif self.pool is not None:
+                processed_flights = process_itineraries_pooled(itineraries[:10], self.pool)
+            else:
+                processed_flights = process_itineraries(itineraries[:10])  # Limit to top 10 flights
             
             return {
                 "data": processed_flights,
@@ -0,0 +1,48 @@
+def process_itineraries(itineraries):
+    """
+    Simplify raw FlyScraper itineraries into flat flight dicts.
+    Lives in its own dependency-free module so worker processes (worker_pool.py)
+    can import it without the agent's setup.
+    """
+    processed_flights = []
+    
+    for itinerary in itineraries:
+        legs = itinerary.get("legs", [])
+        if not legs:
+            continue
+        
+        # Get first leg details
+        leg = legs[0]
+        
+        # Extract price
+        price_info = itinerary.get("pricing", {}).get("pricingOptions", [{}])[0]
+        price = price_info.get("price", {}).get("amount", "N/A")
+        
+        # Extract airline info
+        carriers = leg.get("carriers", {})
+        marketing = carriers.get("marketing", [{}])[0]
+        airline_name = marketing.get("name", "Unknown Airline")
+        flight_number = marketing.get("flightNumber", "")
+        
+        # Extract times
+        departure_time = leg.get("departure", {}).get("time", "")
+        arrival_time = leg.get("arrival", {}).get("time", "")
+        
+        # Extract stops
+        stop_count = leg.get("stopCount", 0)
+        duration = leg.get("durationInMinutes", 0)
+        
+        processed_flight = {
+            "airline": airline_name,
+            "flightNumber": flight_number,
+            "price": price,
+            "departureTime": departure_time,
+            "arrivalTime": arrival_time,
+            "stops": stop_count,
+            "duration": duration,
+            "itineraryId": itinerary.get("id", "")
+        }
+        
+        processed_flights.append(processed_flight)
+
+    return processed_flights
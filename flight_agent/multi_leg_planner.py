@@ -0,0 +1,376 @@
+import re
+import time
+import heapq
+import logging
+import threading
+from collections import OrderedDict
+from datetime import datetime, timedelta
+from concurrent.futures import ThreadPoolExecutor, Future
+
+logger = logging.getLogger('flight_agent')
+
+MONTH_DAY_PATTERN = r'\b([A-Za-z]+)\s+(\d{1,2})(?:st|nd|rd|th)?\b'
+# Query fragments are split on route separators and connector words. Commas are
+# not separators: "Dallas, Texas" is one place and "July 10, July 14" is read as dates.
+FRAGMENT_SEPARATOR_PATTERN = (
+    r'\s*(?:→|->|=>|\b(?:to|then|on|from|and|back|return|leaving|departing|returning|for|via)\b)\s*'
+)
+# Leading words that can share a fragment with a city, e.g. "Trip NYC" or "Fly"
+FILLER_WORDS = {
+    "a", "an", "the", "i", "me", "my", "we", "us", "our", "please", "trip", "fly", "flying",
+    "flight", "flights", "plan", "book", "find", "search", "want", "need", "would", "like",
+    "multi-city", "multicity", "itinerary", "round", "go", "going", "travel", "traveling",
+}
+
+
+class LegSearchError(Exception):
+    pass
+
+
+class LegSearchCache:
+    """
+    Thread-safe cache of processed FlyScraper results keyed by
+    (origin, destination, date, passengers). Concurrent requests for the same
+    key share one in-flight API call instead of issuing duplicates.
+
+    Entries expire after ttl_seconds and at most max_entries are kept (least
+    recently used evicted first). Failed fetches are never cached.
+    """
+    def __init__(self, ttl_seconds=600, max_entries=2048):
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self._lock = threading.Lock()
+        self._entries = OrderedDict()
+
+    def get_or_fetch(self, key, fetch):
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry[0] <= now:
+                del self._entries[key]
+                entry = None
+            owner = entry is None
+            if owner:
+                future = Future()
+                self._entries[key] = (now + self.ttl_seconds, future)
+                while len(self._entries) > self.max_entries:
+                    self._entries.popitem(last=False)
+            else:
+                future = entry[1]
+                self._entries.move_to_end(key)
+
+        if owner:
+            try:
+                future.set_result(fetch())
+            except Exception as e:
+                future.set_exception(e)
+                with self._lock:
+                    # Don't cache failures, allow a retry on the next search
+                    if self._entries.get(key, (None, None))[1] is future:
+                        del self._entries[key]
+        return future.result()
+
+    def __len__(self):
+        return len(self._entries)
+
+
+def _parse_month(name):
+    for fmt in ('%B', '%b'):
+        try:
+            return datetime.strptime(name, fmt).month
+        except ValueError:
+            continue
+    return None
+
+
+def _parse_date(month_name, day, year):
+    """
+    YYYY-MM-DD for a month name and day, or None if that date doesn't exist (e.g. Feb 30).
+    """
+    month = _parse_month(month_name)
+    if not month:
+        return None
+    try:
+        return datetime(year, month, int(day)).strftime("%Y-%m-%d")
+    except ValueError:
+        return None
+
+
+def _parse_city(text):
+    words = text.strip(' ,.!?').split()
+    while words and words[0].lower() in FILLER_WORDS:
+        words.pop(0)
+    city = " ".join(words).strip(' ,')
+    # Passenger counts, years, "flexible by 1 day" etc. are not cities
+    if not city or re.search(r'\d', city):
+        return None
+    return city
+
+
+def _split_fragment(fragment, year):
+    """
+    Split one fragment into ("city", name) and ("date", YYYY-MM-DD) parts in
+    reading order, so "Paris May 3" gives the city and then its date. An
+    impossible date keeps its place as ("date", None) so later dates still
+    line up with their legs.
+    """
+    parts = []
+    position = 0
+    for match in re.finditer(MONTH_DAY_PATTERN, fragment):
+        if not _parse_month(match.group(1)):
+            continue
+        city = _parse_city(fragment[position:match.start()])
+        if city:
+            parts.append(("city", city))
+        date = _parse_date(match.group(1), match.group(2), year)
+        if not date:
+            logger.warning(f"Ignoring invalid date: {match.group(0)}")
+        parts.append(("date", date))
+        position = match.end()
+    city = _parse_city(fragment[position:])
+    if city:
+        parts.append(("city", city))
+    return parts
+
+
+def extract_legs(query, default_flex_days=0):
+    """
+    Extract an ordered list of legs from a multi-city query. Supported forms:
+
+        "New York -> Paris -> Rome -> New York on July 10, July 14 and July 19"
+        "from Boston to Denver on Aug 3 then Denver to Seattle on Aug 6"
+        "Trip NYC → Paris → Rome → NYC from July 10 to July 19"
+        "New York -> Paris May 3 -> Rome May 7"
+
+    Dates written next to a leg belong to that leg; dates listed after the
+    whole route are assigned to legs in order. A trailing "from X to Y" range
+    shorter than the route fixes the first and last legs, and the legs in
+    between get evenly spaced dates (date_inferred True, at least 1 flex day).
+
+    Returns a list of dicts with origin, destination, date (YYYY-MM-DD or None),
+    flex_days and date_inferred.
+    """
+    flex_match = re.search(r'(?:flexible by|±|\+/-)\s*(\d+)\s*days?', query, re.IGNORECASE)
+    flex_days = int(flex_match.group(1)) if flex_match else default_flex_days
+    if flex_match:
+        query = query[:flex_match.start()] + query[flex_match.end():]
+
+    current_year = datetime.now().year
+    cities = []
+    # (date, number of cities seen before it)
+    dates = []
+    for fragment in re.split(FRAGMENT_SEPARATOR_PATTERN, query, flags=re.IGNORECASE):
+        for kind, value in _split_fragment(fragment, current_year):
+            if kind == "date":
+                dates.append((value, len(cities)))
+            # "Denver on Aug 3 then Denver to Seattle" repeats the connecting city
+            elif not cities or cities[-1].lower() != value.lower():
+                cities.append(value)
+
+    legs = [{
+        "origin": cities[i],
+        "destination": cities[i + 1],
+        "date": None,
+        "flex_days": flex_days,
+        "date_inferred": False,
+    } for i in range(len(cities) - 1)]
+    if not legs or not dates:
+        return legs
+
+    interleaved = any(seen < len(cities) for _, seen in dates)
+    if interleaved:
+        # A date belongs to the leg ending at the last city named before it
+        for date, seen in dates:
+            index = seen - 2
+            if date and 0 <= index < len(legs) and legs[index]["date"] is None:
+                legs[index]["date"] = date
+    elif len(dates) == 2 and len(legs) > 2 and all(date for date, _ in dates):
+        first = datetime.strptime(dates[0][0], "%Y-%m-%d")
+        last = datetime.strptime(dates[1][0], "%Y-%m-%d")
+        step = (last - first) / (len(legs) - 1)
+        for i, leg in enumerate(legs):
+            leg["date"] = (first + step * i).strftime("%Y-%m-%d")
+            if 0 < i < len(legs) - 1:
+                leg["date_inferred"] = True
+                leg["flex_days"] = max(flex_days, 1)
+    else:
+        for leg, (date, _) in zip(legs, dates):
+            leg["date"] = date
+
+    missing = [f"{leg['origin']} -> {leg['destination']}" for leg in legs if not leg["date"]]
+    if missing:
+        logger.warning(f"No date found for leg(s): {', '.join(missing)}")
+    return legs
+
+
+def _leg_dates(leg):
+    base = datetime.strptime(leg["date"], "%Y-%m-%d")
+    flex = leg.get("flex_days", 0)
+    return [(base + timedelta(days=offset)).strftime("%Y-%m-%d") for offset in range(-flex, flex + 1)]
+
+
+def _parse_time(value):
+    if not value:
+        return None
+    try:
+        return datetime.fromisoformat(value)
+    except ValueError:
+        return None
+
+
+def _candidate_cost(flight, duration_weight):
+    try:
+        price = float(flight["price"])
+    except (KeyError, TypeError, ValueError):
+        return None
+    return price + duration_weight * float(flight.get("duration") or 0)
+
+
+def combine_itineraries(leg_candidates, k=5, duration_weight=0.5, min_connection_minutes=60):
+    """
+    k-best dynamic programming over ordered legs.
+
+    leg_candidates is one list of processed flights per leg (the dicts produced by
+    FlightAgent._process_flight_results). Each flight scores
+    price + duration_weight * duration, and consecutive legs must leave at least
+    min_connection_minutes between arrival and the next departure.
+
+    For every candidate we keep only the k cheapest partial itineraries ending at it.
+    Sweeping the next leg's candidates in departure order, the feasible predecessors
+    form a growing prefix of the previous leg sorted by arrival, so their merged
+    k-best list is updated incrementally. Cost is O(L * C * (log C + k)) for L legs
+    of C candidates, instead of enumerating C^L combinations.
+
+    Returns up to k itineraries as dicts with total_cost, total_price and flights.
+    """
+    if not leg_candidates or not k:
+        return []
+
+    connection = timedelta(minutes=min_connection_minutes)
+
+    def prepare(flights):
+        prepared = []
+        for flight in flights:
+            cost = _candidate_cost(flight, duration_weight)
+            departure = _parse_time(flight.get("departureTime"))
+            arrival = _parse_time(flight.get("arrivalTime"))
+            # Without both times the connection can't be checked, so skip the flight
+            if cost is None or departure is None or arrival is None:
+                continue
+            prepared.append({
+                "flight": flight,
+                "cost": cost,
+                "departure": departure,
+                "arrival": arrival,
+            })
+        return prepared
+
+    # Partial itineraries are (cost, path) where path is a tuple of flight dicts
+    previous = [(c, [(c["cost"], (c["flight"],))]) for c in prepare(leg_candidates[0])]
+
+    for flights in leg_candidates[1:]:
+        previous.sort(key=lambda item: item[0]["arrival"])
+        current_leg = sorted(prepare(flights), key=lambda c: c["departure"])
+
+        merged = []
+        prefix = 0
+        layer = []
+        for candidate in current_leg:
+            latest_arrival = candidate["departure"] - connection
+            while prefix < len(previous) and previous[prefix][0]["arrival"] <= latest_arrival:
+                merged = heapq.nsmallest(k, merged + previous[prefix][1], key=lambda p: p[0])
+                prefix += 1
+            if not merged:
+                continue
+            layer.append((candidate, [
+                (cost + candidate["cost"], path + (candidate["flight"],)) for cost, path in merged
+            ]))
+        previous = layer
+        if not previous:
+            return []
+
+    best = heapq.nsmallest(k, (p for _, paths in previous for p in paths), key=lambda p: p[0])
+    itineraries = []
+    for cost, path in best:
+        itineraries.append({
+            "total_cost": round(cost, 2),
+            "total_price": round(sum(float(f["price"]) for f in path), 2),
+            "total_duration": sum(f.get("duration") or 0 for f in path),
+            "flights": list(path),
+        })
+    return itineraries
+
+
+class MultiLegPlanner:
+    """
+    Plans multi-city trips on top of a FlightAgent: every (leg, date) pair is
+    searched concurrently through a shared cache and the per-leg candidates are
+    combined with combine_itineraries.
+    """
+    def __init__(self, agent, max_workers=8, cache=None):
+        self.agent = agent
+        self.max_workers = max_workers
+        self.cache = cache or LegSearchCache()
+
+    def _search(self, origin, destination, date, passengers):
+        key = (origin.lower(), destination.lower(), date, passengers)
+
+        def fetch():
+            result = self.agent.get_flights(origin, destination, date, passengers=passengers)
+            # get_flights reports failures in the result instead of raising;
+            # raise so the cache drops the entry and the next plan retries
+            if "error" in result:
+                raise LegSearchError(result["error"])
+            return result
+
+        try:
+            result = self.cache.get_or_fetch(key, fetch)
+        except LegSearchError as e:
+            logger.warning(f"Leg search failed for {origin} -> {destination} on {date}: {e}")
+            return []
+        return result.get("data", [])
+
+    def search_legs(self, legs, passengers=1):
+        """
+        Search all legs and date-window days concurrently; returns one candidate
+        list per leg.
+        """
+        jobs = []
+        with ThreadPoolExecutor(max_workers=self.max_workers) as pool:
+            for leg in legs:
+                jobs.append([
+                    pool.submit(self._search, leg["origin"], leg["destination"], date, passengers)
+                    for date in _leg_dates(leg)
+                ])
+            return [[flight for job in leg_jobs for flight in job.result()] for leg_jobs in jobs]
+
+    def plan(self, legs, passengers=1, k=5, duration_weight=0.5, min_connection_minutes=60):
+        leg_candidates = self.search_legs(legs, passengers)
+        for leg, candidates in zip(legs, leg_candidates):
+            logger.info(f"{leg['origin']} -> {leg['destination']}: {len(candidates)} candidates")
+        return combine_itineraries(leg_candidates, k, duration_weight, min_connection_minutes)
+
+    def get_multi_leg_recommendations(self, user_query, k=5):
+        """
+        Main entry point: extract legs from the query and return the k best itineraries
+        """
+        legs = extract_legs(user_query)
+        details = self.agent.extract_flight_details(user_query)
+        logger.info(f"Extracted legs: {legs}")
+
+        if len(legs) < 2 or not all(leg["date"] for leg in legs):
+            return {"error": "Need at least two legs with a date for each in query.", "legs": legs}
+
+        itineraries = self.plan(legs, passengers=details["passengers"], k=k)
+        return {"legs": legs, "itineraries": itineraries, "count": len(itineraries)}
+
+
+# Example usage
+if __name__ == "__main__":
+    from flight_agent import FlightAgent
+
+    planner = MultiLegPlanner(FlightAgent())
+    result = planner.get_multi_leg_recommendations(
+        "New York -> Paris -> Rome -> New York on July 10, July 14 and July 19 for 2 people, flexible by 1 day"
+    )
+    print(result)
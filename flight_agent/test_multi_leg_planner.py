@@ -0,0 +1,82 @@
+"""
+Regression cases for extract_legs. Run from this directory:
+
+    python -m pytest -q test_multi_leg_planner.py
+"""
+from datetime import datetime
+
+from multi_leg_planner import MultiLegPlanner, extract_legs
+
+YEAR = datetime.now().year
+
+
+def route(legs):
+    return [(leg["origin"], leg["destination"], leg["date"]) for leg in legs]
+
+
+def test_trailing_date_list():
+    legs = extract_legs("New York -> Paris -> Rome -> New York on July 10, July 14 and July 19")
+    assert route(legs) == [
+        ("New York", "Paris", f"{YEAR}-07-10"),
+        ("Paris", "Rome", f"{YEAR}-07-14"),
+        ("Rome", "New York", f"{YEAR}-07-19"),
+    ]
+
+
+def test_repeated_connecting_city():
+    legs = extract_legs("from Boston to Denver on Aug 3 then Denver to Seattle on Aug 6")
+    assert route(legs) == [
+        ("Boston", "Denver", f"{YEAR}-08-03"),
+        ("Denver", "Seattle", f"{YEAR}-08-06"),
+    ]
+
+
+def test_back_and_return_are_connectors():
+    legs = extract_legs("Fly from Boston to Chicago on July 10 then to Rome on July 14 "
+                        "and back to New York on July 19")
+    assert route(legs) == [
+        ("Boston", "Chicago", f"{YEAR}-07-10"),
+        ("Chicago", "Rome", f"{YEAR}-07-14"),
+        ("Rome", "New York", f"{YEAR}-07-19"),
+    ]
+    legs = extract_legs("Fly NYC to LA on July 10 and return to NYC on July 15")
+    assert route(legs) == [("NYC", "LA", f"{YEAR}-07-10"), ("LA", "NYC", f"{YEAR}-07-15")]
+
+
+def test_comma_inside_place_name():
+    legs = extract_legs("Dallas, Texas -> Paris on July 10")
+    assert route(legs) == [("Dallas, Texas", "Paris", f"{YEAR}-07-10")]
+
+
+def test_date_attached_to_city():
+    legs = extract_legs("New York -> Paris May 3 -> Rome May 7")
+    assert route(legs) == [
+        ("New York", "Paris", f"{YEAR}-05-03"),
+        ("Paris", "Rome", f"{YEAR}-05-07"),
+    ]
+
+
+def test_range_interpolates_middle_legs():
+    legs = extract_legs("Trip NYC → Paris → Rome → NYC from July 10 to July 19")
+    assert route(legs) == [
+        ("NYC", "Paris", f"{YEAR}-07-10"),
+        ("Paris", "Rome", f"{YEAR}-07-14"),
+        ("Rome", "NYC", f"{YEAR}-07-19"),
+    ]
+    assert [leg["date_inferred"] for leg in legs] == [False, True, False]
+
+
+def test_invalid_date_is_dropped_in_place():
+    legs = extract_legs("Fly NYC to LA on Feb 30 then LA to SF on Mar 1")
+    assert route(legs) == [("NYC", "LA", None), ("LA", "SF", f"{YEAR}-03-01")]
+
+
+def test_invalid_date_returns_error():
+    class Agent:
+        def extract_flight_details(self, query):
+            return {"passengers": 1}
+
+    result = MultiLegPlanner(Agent()).get_multi_leg_recommendations(
+        "Fly NYC to LA on Feb 30 then LA to SF on Mar 1"
+    )
+    assert "error" in result
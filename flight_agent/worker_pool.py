@@ -0,0 +1,177 @@
+import os
+import json
+import math
+import heapq
+import asyncio
+import logging
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+
+from flight_results import process_itineraries
+
+logger = logging.getLogger('flight_agent')
+
+# "process" (default), "thread" (only useful when the work releases the GIL) or "inline"
+WORKER_MODE = os.getenv("FLIGHT_WORKER_MODE", "process")
+WORKER_COUNT = int(os.getenv("FLIGHT_WORKERS", "0")) or os.cpu_count() or 1
+# Below these sizes dispatch overhead outweighs the parallel speedup, so run inline
+INLINE_ITEMS = int(os.getenv("FLIGHT_INLINE_ITEMS", "2000"))
+INLINE_BYTES = int(os.getenv("FLIGHT_INLINE_BYTES", str(1024 * 1024)))
+
+
+class WorkerPool:
+    """
+    Runs CPU-bound flight processing stages on a process or thread pool,
+    falling back to inline execution for small payloads. The executor is
+    created lazily and reused; use as a context manager or call close().
+    """
+    def __init__(self, mode=WORKER_MODE, max_workers=WORKER_COUNT,
+                 inline_items=INLINE_ITEMS, inline_bytes=INLINE_BYTES):
+        if mode not in ("process", "thread", "inline"):
+            raise ValueError(f"Unknown worker mode: {mode}")
+        self.mode = mode
+        self.max_workers = max_workers
+        self.inline_items = inline_items
+        self.inline_bytes = inline_bytes
+        self._executor = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def close(self):
+        if self._executor is not None:
+            self._executor.shutdown()
+            self._executor = None
+
+    @property
+    def executor(self):
+        if self._executor is None:
+            if self.mode == "process":
+                self._executor = ProcessPoolExecutor(max_workers=self.max_workers)
+            else:
+                self._executor = ThreadPoolExecutor(max_workers=self.max_workers)
+        return self._executor
+
+    def should_inline(self, items=0, size_bytes=0):
+        if self.mode == "inline" or self.max_workers <= 1:
+            return True
+        return items < self.inline_items and size_bytes < self.inline_bytes
+
+    def chunk(self, items):
+        """
+        Split into about one contiguous slice per worker (a few more to even out stragglers).
+        """
+        count = max(1, min(len(items), self.max_workers * 2))
+        size = -(-len(items) // count)
+        return [items[i:i + size] for i in range(0, len(items), size)]
+
+    def map(self, fn, jobs):
+        """
+        Run fn over jobs on the pool, returning results in order.
+        """
+        return list(self.executor.map(fn, jobs))
+
+    async def run(self, fn, *args):
+        """
+        Await a blocking stage without stalling the event loop.
+        """
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(None, fn, *args)
+
+
+def _to_float(value):
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return math.inf
+
+
+def score_flight(flight, price_weight=1.0, duration_weight=0.5, stop_penalty=50.0):
+    """
+    price_weight * price + duration_weight * duration + stop_penalty * stops,
+    lower is better. Flights with a non-numeric component score inf and sort
+    last (checked up front, since 0 * inf would give nan and break sorting).
+    """
+    values = (_to_float(flight.get("price")), _to_float(flight.get("duration")), _to_float(flight.get("stops")))
+    if not all(math.isfinite(value) for value in values):
+        return math.inf
+    price, duration, stops = values
+    return price_weight * price + duration_weight * duration + stop_penalty * stops
+
+
+def _ranked_run(flights, weights, run_id):
+    """
+    Score and sort one run of flights. Keys are (score, run_id, position) so
+    merging runs reproduces a stable sort of the concatenated input.
+    """
+    run = [(score_flight(flight, *weights), run_id, i, flight) for i, flight in enumerate(flights)]
+    run.sort(key=lambda item: item[:3])
+    return run
+
+
+def _merge_runs(runs):
+    return [item[3] for item in heapq.merge(*runs, key=lambda item: item[:3])]
+
+
+def _decode_and_rank_page(args):
+    raw_page, weights, page_no = args
+    data = json.loads(raw_page)
+    flights = process_itineraries(data.get("data", {}).get("itineraries", []))
+    return _ranked_run(flights, weights, page_no)
+
+
+def decode_and_rank_pages(raw_pages, pool, price_weight=1.0, duration_weight=0.5, stop_penalty=50.0):
+    """
+    Decode raw FlyScraper response bodies, normalize their itineraries and
+    return all flights ranked by score_flight.
+
+    Each worker decodes, normalizes, scores and sorts whole pages, so only the
+    compact processed flights cross the process boundary and the parent does
+    a linear k-way merge of the sorted runs.
+    """
+    weights = (price_weight, duration_weight, stop_penalty)
+    jobs = [(page, weights, page_no) for page_no, page in enumerate(raw_pages)]
+    total_bytes = sum(len(page) for page in raw_pages)
+    if pool.should_inline(size_bytes=total_bytes) or len(raw_pages) < 2:
+        runs = [_decode_and_rank_page(job) for job in jobs]
+    else:
+        runs = pool.map(_decode_and_rank_page, jobs)
+    return _merge_runs(runs)
+
+
+def process_itineraries_pooled(itineraries, pool):
+    """
+    process_itineraries chunked across the pool; keeps the input (API) order.
+    """
+    if pool.should_inline(items=len(itineraries)):
+        return process_itineraries(itineraries)
+    return [flight for chunk in pool.map(process_itineraries, pool.chunk(itineraries)) for flight in chunk]
+
+
+def _process_and_rank_chunk(args):
+    itineraries, weights, run_id = args
+    return _ranked_run(process_itineraries(itineraries), weights, run_id)
+
+
+def process_and_rank_itineraries(itineraries, pool, price_weight=1.0, duration_weight=0.5, stop_penalty=50.0):
+    """
+    Same as decode_and_rank_pages for already decoded itineraries, chunked across the pool.
+    """
+    weights = (price_weight, duration_weight, stop_penalty)
+    if pool.should_inline(items=len(itineraries)):
+        runs = [_process_and_rank_chunk((itineraries, weights, 0))]
+    else:
+        runs = pool.map(_process_and_rank_chunk, [
+            (chunk, weights, run_id) for run_id, chunk in enumerate(pool.chunk(itineraries))
+        ])
+    return _merge_runs(runs)
+
+
+async def decode_and_rank_pages_async(raw_pages, pool, **weights):
+    """
+    Async entry point for aggregated searches: decoding, normalization and
+    ranking all happen off the event loop.
+    """
+    return await pool.run(lambda: decode_and_rank_pages(raw_pages, pool, **weights))
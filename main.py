@@ -16,12 +16,14 @@ logger = logging.getLogger("flight_agent")
 # API keys
 GROQ_API_KEY = os.getenv("GROQ_API_KEY")
 GROQ_MODEL = os.getenv("GROQ_MODEL", "llama3-70b-8192")
+# Optional override, e.g. http://localhost:8001 for backend/mock_llm_server.py
+GROQ_BASE_URL = os.getenv("GROQ_BASE_URL")
 RAPIDAPI_KEY = os.getenv("RAPIDAPI_KEY")
 
 class FlightAgent:
     def __init__(self):
         self.api_key = RAPIDAPI_KEY
-        self.groq = Groq(api_key=GROQ_API_KEY)
+        self.groq = Groq(api_key=GROQ_API_KEY, base_url=GROQ_BASE_URL)
         self.sky_id_map = {
             "new york": "NYCA", "dallas": "DFWA", "paris": "PARI",
             "los angeles": "LAXA", "san francisco": "SFOA", "san jose": "SJCA"